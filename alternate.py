@@ -1,7 +1,9 @@
 import os
-from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import sys
 
+from parse import build_csr, parse_instance
+
 
 def output_to_console(result):
     """Print result to the console."""
@@ -19,129 +21,117 @@ def write_to_output_file(result, output_file):
             f"Error writing to output file {output_file}: {e}", file=sys.stderr)
 
 
-def alternate_solution(n, edges, s, t, red_vertices):
-    # --- 1. Build Adjacency List ---
-    adj = {}
-    for edge_line in edges:
-        edge = edge_line.strip()
-        # Check for both directed and undirected
-        if ' -- ' in edge:
-            u, v = edge.split(' -- ')
-            adj.setdefault(u, []).append(v)
-            adj.setdefault(v, []).append(u)
-        elif ' -> ' in edge:
-            u, v = edge.split(' -> ')
-            adj.setdefault(u, []).append(v)
-            # For directed, we don't add the reverse edge
-
-    # --- 2. Handle Edge Cases ---
-    '''
-    If there are no red vertices, then every path
-    is invalid.
-    '''
-    if len(red_vertices) == 0:
-        return False
+def alternate_on_graph(indptr, indices, red, s_id, t_id):
+    """
+    BFS over a prebuilt CSR graph. `red` is a byte-per-vertex mask and
+    `s_id`/`t_id` are integer vertex IDs.
+    """
     '''If s and t are the same, is there a valid path?
     It isn't technically breaking the alternate rule,
     but it isn't fulfilling it either.
     '''
-    if s == t:
+    if s_id == t_id:
         return False
 
+    # --- Initialize traversal ---
+    # Byte-per-vertex masks: one array index instead of a set/dict probe
+    # for every neighbor we touch.
+    num_vertices = len(indptr) - 1
+    visited = bytearray(num_vertices)
+    visited[s_id] = 1
+    # Only reachability matters here, not distances, so any visit order
+    # works -- and a plain list popped from the end beats a deque's
+    # popleft in CPython (contiguous storage, no linked blocks).
+    stack = [s_id]
+
+    # Bind the hot methods once; LOAD_FAST in the loop is markedly
+    # cheaper than attribute lookups per iteration.
+    pop = stack.pop
+    append = stack.append
+
+    # --- Run traversal ---
+    # A vertex's color is just its redness, so a step u -> v alternates
+    # exactly when red[u] != red[v].
+    while stack:
+        u = pop()
+        u_red = red[u]
+
+        for v in indices[indptr[u]:indptr[u + 1]]:
+
+            if visited[v]:
+                continue
 
-    # --- 3. Initialize BFS ---
-    # True = red, False = black
-    temp_color = None
-    if s in red_vertices:
-        temp_color = True
-    else:
-        temp_color = False
+            if red[v] == u_red:  # same color, not an alternating step
+                continue
 
-    queue = deque([(s, temp_color)])  # (vertex, color)
-    visited = {s}
+            # The step to v is valid, so if v is the target we are done --
+            # no need to mark or enqueue it first.
+            if v == t_id:
+                return True
 
-    # --- 4. Run BFS ---
-    while queue:
-        current_vertex, color = queue.popleft()
+            visited[v] = 1
+            append(v)
 
-        for neighbor in adj.get(current_vertex, []):
 
-            if neighbor in visited:
-                continue
+    # --- No Path Found ---
+    return False
 
-            if color:  # if current vertex is red
-                if neighbor in red_vertices: # neighbor vertex is also red
-                    continue
-                else:  # if neighbor vertex is black
-                    visited.add(neighbor)
-                    queue.append((neighbor, False))
-            else:  # if current vertex is black
-                if neighbor in red_vertices: # neighbor vertex is red
-                    visited.add(neighbor)
-                    queue.append((neighbor, True))
-                else:  # if neighbor vertex is also black
-                    continue
-
-            if neighbor == t:
-                return True
 
+def alternate_on_instance(instance):
+    """Runs the solver on a parsed instance (see parse.parse_instance)."""
+    # No red vertices means no path can fulfil the alternation rule, and
+    # an endpoint missing from the edge list is isolated.
+    if not instance["red"]:
+        return False
+    if instance["s_id"] is None or instance["t_id"] is None:
+        return False
+    return alternate_on_graph(
+        instance["indptr"],
+        instance["indices"],
+        instance["red_mask"],
+        instance["s_id"],
+        instance["t_id"],
+    )
 
-    # --- 5. No Path Found ---
-    return False
 
+def alternate_solution(n, edges, s, t, red_vertices):
+    # --- 1. Build CSR Adjacency ---
+    id_of = {}
+    indptr, indices, _ = build_csr(edges, id_of)
 
-def process_file(file_path):
-    """
-    Reads and processes each file based on the *new* format.
-    """
-    try:
-        with open(file_path, 'r') as file:
-            data = [line.strip() for line in file.readlines()
-                    if line.strip()]  # Read all non-empty lines
-    except Exception as e:
-        print(
-            f"Unable to read test case file: {file_path}. Error: {e}", file=sys.stderr)
-        return -1
+    # --- 2. Handle Edge Cases ---
+    '''
+    If there are no red vertices, then every path
+    is invalid.
+    '''
+    if len(red_vertices) == 0:
+        return False
 
-    try:
-        # --- 1. Read Counts (Line 0) ---
-        n, m, r = map(int, data[0].split())
-
-        # --- 2. Read s and t (Line 1) ---
-        s, t = data[1].split()
-
-        # --- 3. Read Vertices and Red Vertices (Lines 2 to n+1) ---
-        vertex_lines_start = 2
-        vertex_lines_end = 2 + n
-        vertex_lines = data[vertex_lines_start: vertex_lines_end]
-
-        red_vertices = set()
-        for line in vertex_lines:
-            if line.endswith('*'):
-                # Get vertex name, remove the " *"
-                vertex_name = line[:-1].strip()
-                red_vertices.add(vertex_name)
-
-        # --- 4. Read Edges (Lines n+2 to n+m+1) ---
-        edge_start_index = vertex_lines_end
-        edge_end_index = edge_start_index + m
-        edges = data[edge_start_index: edge_end_index]
-
-        # --- 5. Validate File ---
-        # Check if we have the right number of red vertices
-        if len(red_vertices) != r:
-            print(
-                f"Warning: File {file_path} said r={r} but found {len(red_vertices)} red vertices.", file=sys.stderr)
+    # Isolated vertices never make it into the edge list, so a missing
+    # s or t means there is no path at all.
+    if s == t:
+        return False
+    if s not in id_of or t not in id_of:
+        return False
 
-        # Check if we have the right number of edges
-        if len(edges) != m:
-            print(
-                f"Warning: File {file_path} said m={m} but found {len(edges)} edges.", file=sys.stderr)
+    red = bytearray(len(id_of))
+    for name in red_vertices:
+        vertex_id = id_of.get(name)
+        if vertex_id is not None:
+            red[vertex_id] = 1
 
-        # --- 6. Call the Solver ---
-        alternate_path = alternate_solution(n, edges, s, t, red_vertices)
-        return alternate_path
+    # --- 3. Run the BFS on the prebuilt graph ---
+    return alternate_on_graph(indptr, indices, red, id_of[s], id_of[t])
 
+
+def process_file(file_path):
+    """Parses one instance via the shared parser and runs the solver."""
+    instance = parse_instance(file_path)
+    if instance is None:
+        return -1
+
+    try:
+        return alternate_on_instance(instance)
     except Exception as e:
         print(
             f"Unable to process test case file: {file_path}. Error: {e}", file=sys.stderr)
@@ -168,22 +158,29 @@ def process_directory(input_dir, output_dir):
         print(f"Input path is not a directory: {input_dir}", file=sys.stderr)
         return
 
-    for file_name in sorted(files):
-        file_path = os.path.join(input_dir, file_name)
-
-        # Ignore README or non-txt files
-        if not file_name.lower().endswith('.txt'):
-            continue
-
-        if os.path.isfile(file_path):
+    # Ignore README or non-txt files
+    file_names = [name for name in sorted(files)
+                  if name.lower().endswith('.txt')
+                  and os.path.isfile(os.path.join(input_dir, name))]
+    file_paths = [os.path.join(input_dir, name) for name in file_names]
+
+    # Every instance is an independent solve, so fan the files out over a
+    # process pool and collect the results back in order. Writes happen in
+    # one pass at the end instead of interleaving with the solves.
+    results = []
+    with ProcessPoolExecutor() as executor:
+        chunksize = max(1, len(file_paths) // (4 * (os.cpu_count() or 1)))
+        for file_name, result in zip(
+                file_names,
+                executor.map(process_file, file_paths, chunksize=chunksize)):
             print(f"--- Processing {file_name} ---", file=sys.stderr)
 
-            result = process_file(file_path)
-
             output_to_console(result)
 
-            output_file = os.path.join(output_subdir, file_name)
-            write_to_output_file(result, output_file)
+            results.append((os.path.join(output_subdir, file_name), result))
+
+    for output_file, result in results:
+        write_to_output_file(result, output_file)
 
 
 def main():
@@ -0,0 +1,31 @@
+/*
+ * Queue-based BFS over a CSR adjacency (see parse.build_csr).
+ *
+ * Marks every vertex reachable from start in visited, one byte per
+ * vertex. queue is caller-provided scratch with room for n entries.
+ * Compiled on demand by cbfs.py; the Python solvers fall back to the
+ * interpreted BFS when no C compiler is around.
+ */
+#include <stdint.h>
+
+void bfs_reach(const int32_t *indptr, const int32_t *indices, int32_t n,
+               int32_t start, uint8_t *visited, int32_t *queue)
+{
+    int32_t head = 0;
+    int32_t tail = 0;
+
+    (void)n;
+    visited[start] = 1;
+    queue[tail++] = start;
+
+    while (head < tail) {
+        int32_t u = queue[head++];
+        for (int32_t k = indptr[u]; k < indptr[u + 1]; k++) {
+            int32_t v = indices[k];
+            if (!visited[v]) {
+                visited[v] = 1;
+                queue[tail++] = v;
+            }
+        }
+    }
+}
@@ -0,0 +1,91 @@
+"""
+Optional C implementation of the CSR reachability sweep.
+
+bfs.c holds a textbook queue-BFS over the CSR arrays the parsers build;
+this module compiles it into a small shared library on first import and
+exposes it through ctypes. Everything is best-effort: if no C compiler
+is available (or the build fails for any reason), LIB stays None and
+callers keep using the pure-Python BFS -- same answers, just slower.
+"""
+
+import ctypes
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+_SOURCE = Path(__file__).resolve().parent / "bfs.c"
+_LIBRARY = _SOURCE.with_name("libbfs.so")
+
+_INT32_P = ctypes.POINTER(ctypes.c_int32)
+_UINT8_P = ctypes.POINTER(ctypes.c_uint8)
+
+
+def _build_library():
+    """Compiles bfs.c if the library is missing or older than the source."""
+    if (_LIBRARY.exists()
+            and _LIBRARY.stat().st_mtime_ns >= _SOURCE.stat().st_mtime_ns):
+        return True
+    # Build to a per-process temp name and rename into place, so
+    # concurrent pool workers never see a half-written library.
+    temp = _LIBRARY.with_name(f".libbfs.{os.getpid()}.so")
+    try:
+        subprocess.run(
+            ["cc", "-O3", "-shared", "-fPIC", "-o", str(temp), str(_SOURCE)],
+            check=True, capture_output=True)
+        os.replace(temp, _LIBRARY)
+        return True
+    except (OSError, subprocess.SubprocessError):
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def _load():
+    if not _SOURCE.exists() or not _build_library():
+        return None
+    try:
+        lib = ctypes.CDLL(str(_LIBRARY))
+        lib.bfs_reach.argtypes = [
+            _INT32_P,          # indptr
+            _INT32_P,          # indices
+            ctypes.c_int32,    # n
+            ctypes.c_int32,    # start
+            _UINT8_P,          # visited (out)
+            _INT32_P,          # queue (scratch)
+        ]
+        lib.bfs_reach.restype = None
+        return lib
+    except OSError as error:
+        print(f"Could not load {_LIBRARY.name}: {error}", file=sys.stderr)
+        return None
+
+
+LIB = _load()
+
+
+def usable(indptr):
+    """The C kernel expects 32-bit CSR entries (array('i') on this
+    platform); anything else stays on the Python path."""
+    return LIB is not None and indptr.itemsize == 4
+
+
+def bfs_reachable_mask(start_node, indptr, indices):
+    """
+    C-backed reachability sweep; call only when usable() is true.
+    Returns the same byte-per-vertex visited mask as the Python BFS.
+    """
+    num_vertices = len(indptr) - 1
+    visited = bytearray(num_vertices)
+    queue = (ctypes.c_int32 * num_vertices)()
+    LIB.bfs_reach(
+        ctypes.cast(indptr.buffer_info()[0], _INT32_P),
+        ctypes.cast(indices.buffer_info()[0], _INT32_P),
+        num_vertices,
+        start_node,
+        (ctypes.c_uint8 * num_vertices).from_buffer(visited),
+        queue,
+    )
+    return visited
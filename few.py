@@ -3,103 +3,135 @@
 import os
 from collections import deque
 import sys
-import heapq  # For Dijkstra's priority queue
 
+from parse import build_csr, parse_instance
 
-def solve_few(n, edges, s, t, red_vertices):
+
+def solve_few_on_graph(indptr, indices, red, s_id, t_id):
     """
     Finds the path from s to t with the *minimum* number of red vertices
-    using Dijkstra's algorithm.
+    using 0-1 BFS over a prebuilt CSR graph.
+
+    Stepping onto a vertex costs 1 if it is red and 0 otherwise, so the
+    weights are binary and a deque (append-left on cost-0 steps, append-
+    right on cost-1 steps) gives the same result as Dijkstra in O(V + E),
+    without any heap operations.
     """
 
-    # --- 1. Build Adjacency List ---
-    adj = {}
-    for edge_line in edges:
-        edge = edge_line.strip()
-        if ' -- ' in edge:
-            u, v = edge.split(' -- ')
-            adj.setdefault(u, []).append(v)
-            adj.setdefault(v, []).append(u)
-        elif ' -> ' in edge:
-            u, v = edge.split(' -> ')
-            adj.setdefault(u, []).append(v)
-
-    # --- 2. Initialize Dijkstra's ---
-
-    # The priority queue stores: (cost, vertex)
-    # "cost" is the count of red vertices on the path so far.
-    pq = []
-
-    # distances[vertex] = min cost (min red vertices) to reach that vertex
-    distances = {}
-
-    # --- 3. Set up Start Node ---
-    start_cost = 1 if s in red_vertices else 0
-    heapq.heappush(pq, (start_cost, s))
-    distances[s] = start_cost
-
-    # --- 4. Run Dijkstra's Algorithm ---
-    while pq:
+    num_vertices = len(indptr) - 1
+
+    # --- 1. Initialize 0-1 BFS ---
+
+    # The deque stores bare vertex IDs; the cost lives in `distances`, so
+    # no (cost, vertex) tuple is allocated per queue entry.
+    dq = deque()
+
+    # distances[v] = min cost (min red vertices) to reach vertex v.
+    # Preallocated flat array; a path visits each red vertex at most once,
+    # so num_vertices + 1 is safely "unreached".
+    unreached = num_vertices + 1
+    distances = [unreached] * num_vertices
+
+    # A vertex's first pop already carries its final distance (Dijkstra's
+    # invariant), so later duplicate queue entries can be skipped.
+    processed = bytearray(num_vertices)
+
+    # --- 2. Set up Start Node ---
+    dq.append(s_id)
+    distances[s_id] = red[s_id]
+
+    # Bind the hot methods once; LOAD_FAST in the loop is markedly
+    # cheaper than attribute lookups per iteration.
+    popleft = dq.popleft
+    append = dq.append
+    appendleft = dq.appendleft
+
+    # --- 3. Run 0-1 BFS ---
+    # The deque holds vertices in non-decreasing cost order (at most two
+    # distinct costs at any time), so popping from the left always yields
+    # a vertex with final distance -- exactly Dijkstra's invariant.
+    while dq:
         # Get the node with the lowest cost
-        current_cost, current_vertex = heapq.heappop(pq)
+        u = popleft()
+
+        if processed[u]:
+            continue
+        processed[u] = 1
+
+        current_cost = distances[u]
 
         # If this is the target, we're done!
-        if current_vertex == t:
+        if u == t_id:
             return current_cost
 
-        # If we've already found a cheaper path, skip this one
-        if current_cost > distances.get(current_vertex, float('inf')):
-            continue
-
-        # --- 5. Explore Neighbors ---
-        for neighbor in adj.get(current_vertex, []):
+        # --- 4. Explore Neighbors ---
+        for v in indices[indptr[u]:indptr[u + 1]]:
 
             # The *new* cost to reach the neighbor is the cost to get to us,
             # *plus* 1 if the neighbor is red.
-            cost_of_neighbor_node = 1 if neighbor in red_vertices else 0
-            new_cost = current_cost + cost_of_neighbor_node
+            new_cost = current_cost + red[v]
 
             # If this is a cheaper path to the neighbor...
-            if new_cost < distances.get(neighbor, float('inf')):
-                distances[neighbor] = new_cost
-                heapq.heappush(pq, (new_cost, neighbor))
-
-    # --- 6. No Path Found ---
+            if new_cost < distances[v]:
+                distances[v] = new_cost
+                # Cost-0 steps go to the front (same BFS layer), cost-1
+                # steps to the back (next layer).
+                if new_cost == current_cost:
+                    appendleft(v)
+                else:
+                    append(v)
+
+    # --- 5. No Path Found ---
     return -1
 
 
-def process_file(file_path):
+def solve_few_on_instance(instance):
+    """Runs the solver on a parsed instance (see parse.parse_instance)."""
+    if instance["s"] == instance["t"]:
+        return 1 if instance["s"] in instance["red"] else 0
+    # Isolated vertices never appear in the edge list, so a missing s or t
+    # means there is no path.
+    if instance["s_id"] is None or instance["t_id"] is None:
+        return -1
+    return solve_few_on_graph(
+        instance["indptr"],
+        instance["indices"],
+        instance["red_mask"],
+        instance["s_id"],
+        instance["t_id"],
+    )
+
+
+def solve_few(n, edges, s, t, red_vertices):
     """
-    Reads a file, parses it, and calls the solver.
+    Finds the path from s to t with the *minimum* number of red vertices.
+    String-based entry point: builds the CSR graph, then runs 0-1 BFS.
     """
-    try:
-        with open(file_path, 'r') as file:
-            data = [line.strip() for line in file.readlines() if line.strip()]
-    except Exception as e:
-        print(f"Unable to read file: {file_path}. Error: {e}", file=sys.stderr)
-        return -1
+    id_of = {}
+    indptr, indices, _ = build_csr(edges, id_of)
 
-    try:
-        n, m, r = map(int, data[0].split())
-        s, t = data[1].split()
+    if s == t:
+        return 1 if s in red_vertices else 0
+    if s not in id_of or t not in id_of:
+        return -1
 
-        vertex_lines_start = 2
-        vertex_lines_end = 2 + n
-        vertex_lines = data[vertex_lines_start: vertex_lines_end]
+    red = bytearray(len(id_of))
+    for name in red_vertices:
+        vertex_id = id_of.get(name)
+        if vertex_id is not None:
+            red[vertex_id] = 1
 
-        red_vertices = set()
-        for line in vertex_lines:
-            if line.endswith('*'):
-                red_vertices.add(line[:-1].strip())
+    return solve_few_on_graph(indptr, indices, red, id_of[s], id_of[t])
 
-        edge_start_index = vertex_lines_end
-        edge_end_index = edge_start_index + m
-        edges = data[edge_start_index: edge_end_index]
 
-        # Call the "Few" solver
-        result = solve_few(n, edges, s, t, red_vertices)
-        return result
+def process_file(file_path):
+    """Parses one instance via the shared parser and runs the solver."""
+    instance = parse_instance(file_path)
+    if instance is None:
+        return -1
 
+    try:
+        return solve_few_on_instance(instance)
     except Exception as e:
         print(
             f"Error processing file: {file_path}. Error: {e}", file=sys.stderr)
@@ -125,6 +157,9 @@ def main():
         print(f"Error reading input directory: {e}", file=sys.stderr)
         return
 
+    # Collect results and flush them to disk in one pass at the end instead
+    # of interleaving solves with per-result file writes.
+    results = []
     for file_name in sorted(files):
         file_path = os.path.join(input_dir, file_name)
 
@@ -137,13 +172,16 @@ def main():
             # 2. Output to console
             print(result, file=sys.stdout)
 
-            # 3. Write to output file
-            output_file = os.path.join(output_subdir, file_name)
-            try:
-                with open(output_file, 'a') as f:
-                    f.write(str(result) + '\n')
-            except Exception as e:
-                print(f"Error writing to output file: {e}", file=sys.stderr)
+            results.append((os.path.join(output_subdir, file_name), result))
+
+    # 3. Write to output files ('w' so re-runs overwrite instead of
+    # appending stale lines)
+    for output_file, result in results:
+        try:
+            with open(output_file, 'w') as f:
+                f.write(str(result) + '\n')
+        except Exception as e:
+            print(f"Error writing to output file: {e}", file=sys.stderr)
 
     print("\nProcessing complete.", file=sys.stderr)
     print(f"Results for 'few' are in: {output_subdir}", file=sys.stderr)
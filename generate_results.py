@@ -1,74 +1,24 @@
 import argparse
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import alternate
 import working_none
 import few
 import working_some
 import solved_many
+from parse import parse_instance
 
 
 def read_instance(path):
-    try:
-        with open(path, "r", encoding="utf-8") as handle:
-            lines = [line.strip() for line in handle if line.strip()]
-    except OSError as error:
-        print(f"Could not read {path}: {error}", file=sys.stderr)
-        return None
-
-    if len(lines) < 2:
-        print(f"File {path} is too short to parse.", file=sys.stderr)
-        return None
-
-    try:
-        n_str, m_str, r_str = lines[0].split()
-        n = int(n_str)
-        m = int(m_str)
-        r = int(r_str)
-        s, t = lines[1].split()
-    except ValueError as error:
-        print(f"Header parse failed for {path}: {error}", file=sys.stderr)
-        return None
-
-    vertex_lines = lines[2: 2 + n]
-    red_vertices = set()
-    for line in vertex_lines:
-        if line.endswith("*"):
-            red_vertices.add(line[:-1].strip())
-
-    if len(red_vertices) != r:
-        print(
-            f"Warning: {path} declares {r} red vertices but found {len(red_vertices)}.",
-            file=sys.stderr,
-        )
-
-    edge_lines = lines[2 + n: 2 + n + m]
-    if len(edge_lines) != m:
-        print(
-            f"Warning: {path} declares {m} edges but found {len(edge_lines)}.",
-            file=sys.stderr,
-        )
-
-    return {
-        "name": os.path.basename(path),
-        "n": n,
-        "s": s,
-        "t": t,
-        "red": red_vertices,
-        "edges": edge_lines,
-    }
+    """Parses one instance via the shared parser (see parse.parse_instance)."""
+    return parse_instance(path)
 
 
 def solve_alternate(instance):
     try:
-        result = alternate.alternate_solution(
-            instance["n"],
-            instance["edges"],
-            instance["s"],
-            instance["t"],
-            instance["red"],
-        )
+        result = alternate.alternate_on_instance(instance)
     except Exception as error:
         print(f"Alternate solver failed on {instance['name']}: {error}", file=sys.stderr)
         return "?"
@@ -77,13 +27,7 @@ def solve_alternate(instance):
 
 def solve_none(instance):
     try:
-        result = working_none.solve_none(
-            instance["n"],
-            instance["edges"],
-            instance["s"],
-            instance["t"],
-            instance["red"],
-        )
+        result = working_none.solve_none_on_instance(instance)
     except Exception as error:
         print(f"None solver failed on {instance['name']}: {error}", file=sys.stderr)
         return "?"
@@ -92,13 +36,7 @@ def solve_none(instance):
 
 def solve_few(instance):
     try:
-        result = few.solve_few(
-            instance["n"],
-            instance["edges"],
-            instance["s"],
-            instance["t"],
-            instance["red"],
-        )
+        result = few.solve_few_on_instance(instance)
     except Exception as error:
         print(f"Few solver failed on {instance['name']}: {error}", file=sys.stderr)
         return "?"
@@ -107,74 +45,64 @@ def solve_few(instance):
 
 def solve_some(instance):
     try:
-        result = working_some.solve_some(
-            instance["n"],
-            instance["edges"],
-            instance["s"],
-            instance["t"],
-            instance["red"],
-        )
+        result = working_some.solve_some_on_instance(instance)
     except Exception as error:
         print(f"Some solver failed on {instance['name']}: {error}", file=sys.stderr)
         return "?"
-    return str(result)
+    return "true" if result else "false"
 
 
 def solve_many(instance):
     try:
-        n = instance["n"]
-        edges = instance["edges"]
-        E_count = len(edges)
-        s = instance["s"]
-        t = instance["t"]
-        red = instance["red"]
-
-        result = solved_many.solve_many_entry(
-            n,
-            E_count,
-            s,
-            t,
-            red,
-            edges
-        )
+        result = solved_many.solve_many_on_instance(instance)
     except Exception as error:
         print(f"Many solver failed on {instance['name']}: {error}", file=sys.stderr)
         return "?"
     return str(result)
 
 
+def solve_file(file_path):
+    """Parses one instance and runs all five solvers; returns a result row."""
+    instance = read_instance(file_path)
+    if instance is None:
+        return None
+
+    alt_answer = solve_alternate(instance)
+    none_answer = solve_none(instance)
+    few_answer = solve_few(instance)
+    some_answer = solve_some(instance)
+    many_answer = solve_many(instance)
+
+    return "\t".join(
+        [
+            instance["name"],
+            str(instance["n"]),
+            alt_answer,
+            few_answer,
+            many_answer,
+            none_answer,
+            some_answer,
+        ]
+    )
+
+
 def gather_rows(data_dir):
-    rows = []
-    for file_name in sorted(os.listdir(data_dir)):
-        if not file_name.lower().endswith(".txt"):
-            continue
-
-        file_path = os.path.join(data_dir, file_name)
-        if not os.path.isfile(file_path):
-            continue
-
-        instance = read_instance(file_path)
-        if instance is None:
-            continue
-
-        alt_answer = solve_alternate(instance)
-        none_answer = solve_none(instance)
-        few_answer = solve_few(instance)
-        some_answer = solve_some(instance)
-        many_answer = solve_many(instance)
-
-        row = "\t".join(
-            [
-                instance["name"],
-                str(instance["n"]),
-                alt_answer,
-                few_answer,
-                many_answer,
-                none_answer,
-                some_answer,
-            ]
-        )
-        rows.append(row)
+    file_paths = [
+        os.path.join(data_dir, file_name)
+        for file_name in sorted(os.listdir(data_dir))
+        if file_name.lower().endswith(".txt")
+        and os.path.isfile(os.path.join(data_dir, file_name))
+    ]
+
+    # Each instance is parsed and solved independently, so fan the files
+    # out over a process pool; map() returns rows in input order.
+    with ProcessPoolExecutor() as executor:
+        chunksize = max(1, len(file_paths) // (4 * (os.cpu_count() or 1)))
+        rows = [
+            row
+            for row in executor.map(solve_file, file_paths, chunksize=chunksize)
+            if row is not None
+        ]
     return rows
 
 
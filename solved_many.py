@@ -1,6 +1,9 @@
-import os 
+import os
 import sys
-from collections import deque, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from parse import build_csr, parse_instance
 
 # --- Utility Functions for File I/O ---
 
@@ -22,208 +25,138 @@ def write_to_output_file(result, output_file):
         print(
             f"Error writing to output file {output_file}: {e}", file=sys.stderr)
 
-# --- Utility Functions for Parsing and Output ---
-
-def process_file(file_path):
-    """Parses a graph definition file according to the 'Red Scare' format."""
-    try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        return f"Error: File not found at {file_path}", -1, -1, [], []
-
-    if len(lines) < 2:
-        return "Error: File too short", -1, -1, [], []
+# --- Core Logic for 'Many' Problem Solvers ---
 
-    # --- 1. Header (N, M, |R|) ---
-    header_parts = lines[0].split()
-    if len(header_parts) < 2:
-        return "Error: Invalid header format", -1, -1, [], []
-        
-    N = int(header_parts[0])
-    
-    # --- 2. Start and Target Vertices (s, t) ---
-    s, t = lines[1].split()
-    s = s.strip()
-    t = t.strip()
-    
-    # --- 3. Node/Red Vertex Parsing ---
-    red_vertices = []
-    start_of_edges = 2 + N
-    
-    for i in range(2, start_of_edges):
-        line = lines[i].strip()
-        if not line: continue
-        parts = line.split()
-        node_id = parts[0]
-        if len(parts) > 1 and parts[1] == '*':
-            red_vertices.append(node_id)
-            
-    # --- 4. Edge Parsing ---
-    edge_list = []
-    for i in range(start_of_edges, len(lines)):
-        edge_line = lines[i].strip()
-        if edge_line:
-            edge_list.append(edge_line)
-            
-    return N, len(edge_list), s, t, red_vertices, edge_list
-
-# --- Graph Building and Classification ---
-
-def build_graph_and_reverse(edges):
+def _can_reach(indptr, indices, num_vertices, s, t):
     """
-    Builds graph structures and classifies the graph type based on edges.
-    Returns: adj, rev_adj, nodes, is_purely_undirected, has_mixed_edges
-    """
-    adj = defaultdict(list)
-    nodes = set()
-    is_purely_undirected = True
-    
-    for edge_line in edges:
-        edge = edge_line.strip()
-        u, v = None, None
-
-        if ' -- ' in edge:
-            u, v = [x.strip() for x in edge.split(' -- ')]
-            # Undirected (handled as two directed edges for cycle detection)
-            adj[u].append(v)
-            adj[v].append(u)
-        elif ' -> ' in edge:
-            u, v = [x.strip() for x in edge.split(' -> ')]
-            # Directed
-            adj[u].append(v)
-
-            is_purely_undirected = False
-        
-        if u and v:
-            nodes.add(u)
-            nodes.add(v)
-    
-
-    return adj, list(nodes), is_purely_undirected
-
-
-def get_topological_order_and_check_dag(adj, nodes):
+    Plain reachability check from s to t. Visit order is irrelevant, so a
+    list used as a stack (DFS) is enough.
+    Time Complexity: O(V + E)
     """
-    Uses Kahn's algorithm (in-degree based) to find the topological order
-    and check for cycles simultaneously.
-    Returns: (topological_order, is_dag)
+    visited = bytearray(num_vertices)
+    visited[s] = 1
+    stack = [s]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        u = pop()
+        if u == t:
+            return True
+        for v in indices[indptr[u]:indptr[u + 1]]:
+            if not visited[v]:
+                visited[v] = 1
+                push(v)
+    return False
+
+
+def solve_many_dag(indptr, indices, num_vertices, s, t, red):
     """
-    in_degree = {node: 0 for node in nodes}
-    for u in nodes:
-        for v in adj.get(u, []):
-            in_degree[v] += 1
-            
-    queue = deque([u for u in nodes if in_degree[u] == 0])
-    topological_order = []
-    
-    while queue:
-        u = queue.popleft()
-        topological_order.append(u)
-        
-        for v in adj.get(u, []):
-            in_degree[v] -= 1
-            if in_degree[v] == 0:
-                queue.append(v)
-
-    is_dag = (len(topological_order) == len(nodes))
-    
-    return topological_order, is_dag
-
+    Runs Kahn's algorithm and the longest-path DP in a single fused pass.
 
-# --- Core Logic for 'Many' Problem Solvers ---
-
-def solve_many_dag(adj, nodes, s, t, R, topological_order):
-    """
-    Solves the 'Many' problem for a known Directed Acyclic Graph (DAG) 
-    using Dynamic Programming (Longest Path on DAG).
+    When Kahn's algorithm dequeues a vertex every predecessor has already
+    been dequeued, so its dp value is final and its out-edges can be
+    relaxed on the spot -- no intermediate topological-order list, and
+    cycle detection comes out of the same loop.
+    Returns: (is_dag, result), where result is only meaningful for a DAG.
     Time Complexity: O(V + E)
     """
-    
-    # DP[v] = Maximum number of red vertices on any path from s to v.
-    dp = {node: -1 for node in nodes}
-    
-    if s not in nodes: return -1
-        
-    s_is_red = 1 if s in R else 0
-    dp[s] = s_is_red
-
-    for u in topological_order:
-        if dp[u] != -1: # Only process nodes reachable from s
-            for v in adj.get(u, []):
-                v_cost = 1 if v in R else 0
-                new_cost = dp[u] + v_cost
-                dp[v] = max(dp[v], new_cost)
-
-    return dp.get(t, -1)
-
-
-def solve_many_undirected_acyclic(adj, nodes, s, t, R):
+    in_degree = [0] * num_vertices
+    for v in indices:
+        in_degree[v] += 1
+
+    # dp[v] = Maximum number of red vertices on any path from s to v.
+    dp = [-1] * num_vertices
+    dp[s] = red[s]
+
+    # Every vertex is enqueued at most once, so a plain list with a read
+    # head replaces the deque.
+    queue = [u for u in range(num_vertices) if in_degree[u] == 0]
+    append = queue.append
+    head = 0
+
+    while head < len(queue):
+        u = queue[head]
+        head += 1
+
+        dp_u = dp[u]
+        if dp_u != -1: # Only relax edges out of nodes reachable from s
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                new_cost = dp_u + red[v]
+                if new_cost > dp[v]:
+                    dp[v] = new_cost
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    append(v)
+        else:
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    append(v)
+
+    is_dag = (len(queue) == num_vertices)
+
+    return is_dag, dp[t]
+
+
+def solve_many_undirected_acyclic(indptr, indices, num_vertices, s, t, red):
     """
     Solves the 'Many' problem for an Undirected Acyclic Graph (Tree).
-    Since it's acyclic, a single modified BFS is sufficient to find the max
-    red cost path, as there is a unique simple path between any two nodes.
+    The s,t-path in a tree is unique, so "first assignment wins" -- a
+    single DFS carrying the running red count along each root-to-leaf
+    walk replaces the per-vertex cost array and max merge entirely, and
+    the walk stops as soon as it reaches t.
+
+    A visited mask (not just parent avoidance) skips the back edge on a
+    tree and, crucially, guarantees termination when a cyclic graph
+    slips through the caller's V == E + 1 test -- that count also holds
+    for, say, a unicyclic component next to a smaller tree, where a
+    parent-only check would walk the cycle forever.
     Time Complexity: O(V + E)
     """
-    
-    # Check if s and t exist
-    if s not in nodes or t not in nodes:
-        return -1
-    
-    # DP[v] stores the max red cost path from s to v.
-    # We use a BFS approach since the graph is unweighted and acyclic.
-    
-    queue = deque()
-    # Cost maps stores the max red count found so far to reach node v.
-    max_red_cost = {node: -1 for node in nodes}
 
-    s_is_red = 1 if s in R else 0
-    max_red_cost[s] = s_is_red
-    queue.append(s)
+    # Explicit stack of (vertex, red count so far); recursion could
+    # overflow on path-shaped trees. Marking on push is the same
+    # "first assignment wins" rule as before.
+    visited = bytearray(num_vertices)
+    visited[s] = 1
+    stack = [(s, red[s])]
+    pop = stack.pop
+    push = stack.append
 
-    while queue:
-        u = queue.popleft()
-        
-        # Check neighbors
-        for v in adj.get(u, []):
-            
-            # Since the graph is a tree (undirected acyclic), every edge 
-            # is traversed only once in the BFS direction (away from s).
-            # The 'visited' concept is implicitly handled by only processing 
-            # a neighbor if a better path to it is found (not necessary here 
-            # due to unique paths, but good practice).
-            
-            # Cost of v
-            v_cost = 1 if v in R else 0
-            
-            new_cost = max_red_cost[u] + v_cost
+    while stack:
+        u, cost = pop()
 
-            if max_red_cost[v] == -1:
-                max_red_cost[v] = new_cost
-                queue.append(v)
+        if u == t:
+            return cost
 
-            if v == t:
-                return new_cost 
+        for v in indices[indptr[u]:indptr[u + 1]]:
+            if not visited[v]:
+                visited[v] = 1
+                push((v, cost + red[v]))
 
+    return -1
 
-    return max_red_cost.get(t, -1)
 
+def solve_many_on_graph(indptr, indices, num_vertices, s_id, t_id, red,
+                        E_count, is_purely_undirected):
+    """Classifies a prebuilt CSR graph and dispatches to the right solver."""
 
-def solve_many_entry(n, E_count, s, t, red_vertices, edge_list):
-    """Main entry point for the 'Many' problem logic."""
-    
-    adj, nodes, is_purely_undirected = build_graph_and_reverse(edge_list)
-    R = set(red_vertices)
-    
-    # Check for DAG and get topological order using Kahn's algorithm
-    topological_order, is_dag = get_topological_order_and_check_dag(adj, nodes)
+    # If t is not reachable from s at all, the answer is -1 no matter how
+    # the graph classifies; one cheap traversal skips the reordering, the
+    # DP and the NP-HARD classification alike.
+    if not _can_reach(indptr, indices, num_vertices, s_id, t_id):
+        return -1
+
+    # Fused Kahn's algorithm + DP: checks for a DAG and computes the
+    # longest red path in the same pass.
+    is_dag, result = solve_many_dag(
+        indptr, indices, num_vertices, s_id, t_id, red)
 
     if is_dag:
         # Case 1: Purely Directed Acyclic Graph
-        result = solve_many_dag(adj, nodes, s, t, R, topological_order)
         return result
 
-    elif is_purely_undirected and len(nodes) == E_count + 1 :
+    elif is_purely_undirected and num_vertices == E_count + 1 :
 
         # Case 2: Undirected Acyclic Graph (Tree)
         # If the graph is purely undirected, Kahn's algorithm fails 
@@ -261,15 +194,76 @@ def solve_many_entry(n, E_count, s, t, red_vertices, edge_list):
         # that the non-DAG P-time cases are limited to Undirected Acyclic Graphs.
         
         # Let's use the dedicated O(V+E) BFS for maximum path cost on the undirected structure.
-        return solve_many_undirected_acyclic(adj, nodes, s, t, R)
+        return solve_many_undirected_acyclic(
+            indptr, indices, num_vertices, s_id, t_id, red)
     
     else:
         # Case 3: Cyclic (Directed or Mixed) Graph
         # This covers: Directed Cyclic Graphs, Mixed Graphs, and Undirected Cyclic Graphs.
         return "NP-HARD"
 
+
+def solve_many_on_instance(instance):
+    """Runs the solver on a parsed instance (see parse.parse_instance)."""
+    # The trivial single-vertex path is the only s,t-path when s == t
+    # (paths cannot revisit s), and it exists even for an isolated
+    # vertex, so this must be decided before the missing-ID check.
+    if instance["s"] == instance["t"]:
+        return 1 if instance["s"] in instance["red"] else 0
+    # Beyond that, isolated vertices never appear in the edge list, so a
+    # missing s or t means no s,t-path can exist.
+    if instance["s_id"] is None or instance["t_id"] is None:
+        return -1
+
+    return solve_many_on_graph(
+        instance["indptr"],
+        instance["indices"],
+        instance["num_vertices"],
+        instance["s_id"],
+        instance["t_id"],
+        instance["red_mask"],
+        len(instance["edges"]),
+        instance["is_purely_undirected"],
+    )
+
+
+def solve_many_entry(n, E_count, s, t, red_vertices, edge_list):
+    """Main entry point for the 'Many' problem logic (string-based API)."""
+
+    id_of = {}
+    indptr, indices, is_purely_undirected = build_csr(edge_list, id_of)
+    num_vertices = len(id_of)
+
+    # The trivial single-vertex path is the only s,t-path when s == t
+    # (paths cannot revisit s), and it exists even for an isolated
+    # vertex, so this must be decided before the missing-ID check.
+    if s == t:
+        return 1 if s in red_vertices else 0
+    # Beyond that, isolated vertices never appear in the edge list, so a
+    # missing s or t means no s,t-path can exist.
+    if s not in id_of or t not in id_of:
+        return -1
+
+    red = bytearray(num_vertices)
+    for name in red_vertices:
+        vertex_id = id_of.get(name)
+        if vertex_id is not None:
+            red[vertex_id] = 1
+
+    return solve_many_on_graph(
+        indptr, indices, num_vertices, id_of[s], id_of[t], red,
+        E_count, is_purely_undirected)
+
 # --- Main Runner Function ---
 
+def _parse_and_solve(file_path, solver_function):
+    """Pool worker: parse one file and run the solver on it."""
+    instance = parse_instance(file_path)
+    if instance is None:
+        return f"Error: could not parse {file_path}"
+    return solver_function(instance)
+
+
 def main_runner(input_dir, output_subdir, solver_function):
     """
     Traverses the input directory, processes each .txt file using the solver_function,
@@ -294,31 +288,26 @@ def main_runner(input_dir, output_subdir, solver_function):
         print(f"Input path is not a directory: {input_dir}", file=sys.stderr)
         return
 
-    # Process files
-    for file_name in sorted(files):
-        file_path = os.path.join(input_dir, file_name)
-
-        # Only process .txt files
-        if not file_name.lower().endswith('.txt'):
-            continue
-
-        if os.path.isfile(file_path):
+    # Only process .txt files
+    file_names = [name for name in sorted(files)
+                  if name.lower().endswith('.txt')
+                  and os.path.isfile(os.path.join(input_dir, name))]
+    file_paths = [os.path.join(input_dir, name) for name in file_names]
+
+    # Each instance is an independent parse + solve, so fan the files out
+    # over a process pool and collect results back in input order.
+    worker = partial(_parse_and_solve, solver_function=solver_function)
+    with ProcessPoolExecutor() as executor:
+        chunksize = max(1, len(file_paths) // (4 * (os.cpu_count() or 1)))
+        for file_name, result in zip(
+                file_names,
+                executor.map(worker, file_paths, chunksize=chunksize)):
             print(f"--- Processing {file_name} for 'Many' problem ---", file=sys.stderr)
 
-            # 1. Parse the file
-            parse_result = process_file(file_path)
-
-            if isinstance(parse_result, str) and parse_result.startswith("Error"):
-                result = parse_result
-            else:
-                # 2. Solve the 'Many' problem
-                N, E_count, s, t, red_vertices, edge_list = parse_result
-                result = solver_function(N, E_count, s, t, red_vertices, edge_list)
-
-            # 3. Output to console
+            # Output to console
             output_to_console(result)
 
-            # 4. Save to output file
+            # Save to output file
             output_file = os.path.join(output_subdir, file_name)
             write_to_output_file(result, output_file)
 
@@ -332,4 +321,4 @@ if __name__ == '__main__':
     output_dir = os.path.join(script_dir, 'output_many') 
     
     # Run the main file processor
-    main_runner(input_dir, output_dir, solve_many_entry)
+    main_runner(input_dir, output_dir, solve_many_on_instance)
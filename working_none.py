@@ -1,7 +1,10 @@
 import os
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import sys
 
+from parse import load_instance
+
 
 def output_to_console(result):
     """Print result to the console."""
@@ -11,13 +14,74 @@ def output_to_console(result):
 def write_to_output_file(result, output_file):
     """Write result to a specific output file."""
     try:
-        with open(output_file, 'a') as file:
+        # Use write mode so each run overwrites previous results for the file
+        with open(output_file, 'w') as file:
             file.write(str(result) + '\n')
     except Exception as e:
         print(
             f"Error writing to output file {output_file}: {e}", file=sys.stderr)
 
 
+def solve_none_on_graph(indptr, indices, red, s_id, t_id):
+    """
+    BFS over a prebuilt CSR graph (see parse.build_csr). Vertices are
+    integer IDs and `red` is a byte-per-vertex mask, so the red test in
+    the hottest branch is one byte load instead of a set probe. Same
+    "internally avoiding R" rules as solve_none below.
+    """
+    if s_id == t_id:
+        return 0
+
+    queue = deque([(s_id, 0)])  # (vertex, distance)
+    # Byte-per-vertex mask: membership is one array index instead of a
+    # set probe (hash + pointer chase) per neighbor.
+    visited = bytearray(len(indptr) - 1)
+    visited[s_id] = 1
+
+    # Bind the hot methods once; LOAD_FAST in the loop is markedly
+    # cheaper than attribute lookups per iteration.
+    popleft = queue.popleft
+    append = queue.append
+
+    while queue:
+        u, dist = popleft()
+
+        for v in indices[indptr[u]:indptr[u + 1]]:
+
+            if visited[v]:
+                continue
+
+            # The target is always allowed, even when red.
+            if v == t_id:
+                return dist + 1
+
+            # Internal red vertices are forbidden.
+            if red[v]:
+                continue
+
+            visited[v] = 1
+            append((v, dist + 1))
+
+    return -1
+
+
+def solve_none_on_instance(instance):
+    """Runs the solver on a parsed instance (see parse.parse_instance)."""
+    if instance["s"] == instance["t"]:
+        return 0
+    # Isolated vertices never appear in the edge list, so a missing s or t
+    # means there is no path.
+    if instance["s_id"] is None or instance["t_id"] is None:
+        return -1
+    return solve_none_on_graph(
+        instance["indptr"],
+        instance["indices"],
+        instance["red_mask"],
+        instance["s_id"],
+        instance["t_id"],
+    )
+
+
 def solve_none(n, edges, s, t, red_vertices):
     """
     Finds the length of the shortest s, t-path internally avoiding R using BFS.
@@ -29,108 +93,108 @@ def solve_none(n, edges, s, t, red_vertices):
     """
 
     # --- 1. Build Adjacency List ---
-    adj = {}
+    # Two passes: first intern vertex names to integer IDs and count
+    # degrees, then fill preallocated per-vertex lists with a cursor.
+    # setdefault(...).append per edge pays for a dict probe plus amortized
+    # list resizes; fixed-size lists are filled with plain index stores.
+    id_of = {}
+    arcs = []
+    degrees = []
     for edge_line in edges:
         edge = edge_line.strip()
-        # Check for both directed and undirected
-        if ' -- ' in edge:
-            u, v = edge.split(' -- ')
-            adj.setdefault(u, []).append(v)
-            adj.setdefault(v, []).append(u)
-        elif ' -> ' in edge:
-            u, v = edge.split(' -> ')
-            adj.setdefault(u, []).append(v)
-            # For directed, we don't add the reverse edge
+        sep = edge.find(' -- ')
+        directed = False
+        if sep < 0:
+            sep = edge.find(' -> ')
+            if sep < 0:
+                continue
+            directed = True
+        u = id_of.setdefault(edge[:sep], len(id_of))
+        if u == len(degrees):
+            degrees.append(0)
+        v = id_of.setdefault(edge[sep + 4:], len(id_of))
+        if v == len(degrees):
+            degrees.append(0)
+
+        arcs.append((u, v))
+        degrees[u] += 1
+        if not directed:
+            arcs.append((v, u))
+            degrees[v] += 1
+
+    num_vertices = len(degrees)
+    adj = [[0] * degrees[u] for u in range(num_vertices)]
+    cursor = [0] * num_vertices
+    for u, v in arcs:
+        adj[u][cursor[u]] = v
+        cursor[u] += 1
 
     # --- 2. Handle Edge Cases ---
     if s == t:
         return 0
 
+    # Isolated vertices never appear in the edge list, so a missing s or t
+    # means there is no path.
+    if s not in id_of or t not in id_of:
+        return -1
+
+    s_id = id_of[s]
+    t_id = id_of[t]
+    red = bytearray(num_vertices)
+    for name in red_vertices:
+        vertex_id = id_of.get(name)
+        if vertex_id is not None:
+            red[vertex_id] = 1
+
     # --- 3. Initialize BFS ---
-    queue = deque([(s, 0)])  # (vertex, distance)
-    visited = {s}
+    queue = deque([(s_id, 0)])  # (vertex, distance)
+    # Byte-per-vertex mask instead of a set: one array index per
+    # membership test, no hashing.
+    visited = bytearray(num_vertices)
+    visited[s_id] = 1
+
+    # Bind the hot methods once; LOAD_FAST in the loop is markedly
+    # cheaper than attribute lookups per iteration.
+    popleft = queue.popleft
+    append = queue.append
 
     # --- 4. Run BFS ---
     while queue:
-        current_vertex, dist = queue.popleft()
+        current_vertex, dist = popleft()
 
-        for neighbor in adj.get(current_vertex, []):
+        for neighbor in adj[current_vertex]:
 
-            if neighbor in visited:
+            if visited[neighbor]:
                 continue
 
             # CASE 1: The neighbor is the target 't'.
             # This is always a valid path.
-            if neighbor == t:
+            if neighbor == t_id:
                 return dist + 1
 
             # CASE 2: The neighbor is NOT 't' and IS RED.
             # This is an "internal" node. We are not allowed
             # to use this path. Skip this neighbor.
-            if neighbor in red_vertices:
+            if red[neighbor]:
                 continue
 
             # CASE 3: The neighbor is NOT 't' and is NOT RED.
             # This is a valid internal node. Add it to the queue.
-            visited.add(neighbor)
-            queue.append((neighbor, dist + 1))
+            visited[neighbor] = 1
+            append((neighbor, dist + 1))
 
     # --- 5. No Path Found ---
     return -1
 
 
 def process_file(file_path):
-    """
-    Reads and processes each file based on the *new* format.
-    """
-    try:
-        with open(file_path, 'r') as file:
-            data = [line.strip() for line in file.readlines()
-                    if line.strip()]  # Read all non-empty lines
-    except Exception as e:
-        print(
-            f"Unable to read test case file: {file_path}. Error: {e}", file=sys.stderr)
+    """Parses one instance via the shared parser and runs the solver."""
+    instance = load_instance(file_path)
+    if instance is None:
         return -1
 
     try:
-        # --- 1. Read Counts (Line 0) ---
-        n, m, r = map(int, data[0].split())
-
-        # --- 2. Read s and t (Line 1) ---
-        s, t = data[1].split()
-
-        # --- 3. Read Vertices and Red Vertices (Lines 2 to n+1) ---
-        vertex_lines_start = 2
-        vertex_lines_end = 2 + n
-        vertex_lines = data[vertex_lines_start: vertex_lines_end]
-
-        red_vertices = set()
-        for line in vertex_lines:
-            if line.endswith('*'):
-                # Get vertex name, remove the " *"
-                vertex_name = line[:-1].strip()
-                red_vertices.add(vertex_name)
-
-        # --- 4. Read Edges (Lines n+2 to n+m+1) ---
-        edge_start_index = vertex_lines_end
-        edge_end_index = edge_start_index + m
-        edges = data[edge_start_index: edge_end_index]
-
-        # --- 5. Validate File ---
-        # Check if we have the right number of red vertices
-        if len(red_vertices) != r:
-            print(
-                f"Warning: File {file_path} said r={r} but found {len(red_vertices)} red vertices.", file=sys.stderr)
-
-        # Check if we have the right number of edges
-        if len(edges) != m:
-            print(
-                f"Warning: File {file_path} said m={m} but found {len(edges)} edges.", file=sys.stderr)
-
-        # --- 6. Call the Solver ---
-        shortest_path = solve_none(n, edges, s, t, red_vertices)
-        return shortest_path
-
+        return solve_none_on_instance(instance)
     except Exception as e:
         print(
             f"Unable to process test case file: {file_path}. Error: {e}", file=sys.stderr)
@@ -157,22 +221,29 @@ def process_directory(input_dir, output_dir):
         print(f"Input path is not a directory: {input_dir}", file=sys.stderr)
         return
 
-    for file_name in sorted(files):
-        file_path = os.path.join(input_dir, file_name)
-
-        # Ignore README or non-txt files
-        if not file_name.lower().endswith('.txt'):
-            continue
-
-        if os.path.isfile(file_path):
+    # Ignore README or non-txt files
+    file_names = [name for name in sorted(files)
+                  if name.lower().endswith('.txt')
+                  and os.path.isfile(os.path.join(input_dir, name))]
+    file_paths = [os.path.join(input_dir, name) for name in file_names]
+
+    # Every instance is an independent solve, so fan the files out over a
+    # process pool and collect the results back in order. Writes happen in
+    # one pass at the end instead of interleaving with the solves.
+    results = []
+    with ProcessPoolExecutor() as executor:
+        chunksize = max(1, len(file_paths) // (4 * (os.cpu_count() or 1)))
+        for file_name, result in zip(
+                file_names,
+                executor.map(process_file, file_paths, chunksize=chunksize)):
             print(f"--- Processing {file_name} ---", file=sys.stderr)
 
-            result = process_file(file_path)
-
             output_to_console(result)
 
-            output_file = os.path.join(output_subdir, file_name)
-            write_to_output_file(result, output_file)
+            results.append((os.path.join(output_subdir, file_name), result))
+
+    for output_file, result in results:
+        write_to_output_file(result, output_file)
 
 
 def main():
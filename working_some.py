@@ -1,111 +1,281 @@
 import os
-from collections import deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 import sys
 
+import cbfs
+from parse import build_csr, load_instance
 
-def _build_adjacency_list(edges):
+
+def _reverse_csr(indptr, indices, num_vertices):
     """
-    Builds a standard forward adjacency list.
+    Derives the reverse CSR adjacency straight from the forward one:
+    count in-degrees, prefix sum, then scatter each arc u -> v into v's
+    reverse row.
     """
-    adj = {}
-    for edge_line in edges:
-        edge = edge_line.strip()
+    rev_indptr = array('i', [0]) * (num_vertices + 1)
+    for v in indices:
+        rev_indptr[v + 1] += 1
+    for i in range(num_vertices):
+        rev_indptr[i + 1] += rev_indptr[i]
 
-        if ' -- ' in edge:
-            u, v = edge.split(' -- ')
-            adj.setdefault(u, []).append(v)
-            adj.setdefault(v, []).append(u)
+    cursor = list(rev_indptr[:num_vertices])
+    rev_indices = array('i', [0]) * len(indices)
+    for u in range(num_vertices):
+        for v in indices[indptr[u]:indptr[u + 1]]:
+            rev_indices[cursor[v]] = u
+            cursor[v] += 1
 
-        elif ' -> ' in edge:
-            u, v = edge.split(' -> ')
-            adj.setdefault(u, []).append(v)
+    return rev_indptr, rev_indices
 
-    return adj
 
+def _build_adjacency_list(edges):
+    """
+    Interns vertex names to integer IDs and builds forward and reverse
+    CSR adjacencies (see parse.build_csr), so the BFS inner loop walks a
+    contiguous array slice instead of hashing string keys per step.
+    Returns: indptr, indices, rev_indptr, rev_indices, id_of
+    """
+    id_of = {}
+    indptr, indices, is_purely_undirected = build_csr(edges, id_of)
 
-def _bfs_can_reach(start_node, end_node, adj):
+    # Undirected edges are stored as symmetric arc pairs, so the reverse
+    # CSR of a purely undirected graph is an exact duplicate of the
+    # forward one -- share the arrays instead of rebuilding them.
+    if is_purely_undirected:
+        return indptr, indices, indptr, indices, id_of
 
+    rev_indptr, rev_indices = _reverse_csr(indptr, indices, len(id_of))
+    return indptr, indices, rev_indptr, rev_indices, id_of
+
+
+def _bidir_reach(start_node, end_node, indptr, indices,
+                 rev_indptr, rev_indices):
+    """
+    Bidirectional reachability probe: expands level by level forward
+    from start_node and backward (over the reverse CSR) from end_node,
+    always growing the smaller frontier, and stops the moment the two
+    searches touch. With branching factor b and distance d this explores
+    O(b^(d/2)) vertices from each side instead of O(b^d) from one; if
+    either side exhausts without meeting, no path exists.
+    """
     if start_node == end_node:
         return True
 
-    queue = deque([start_node])
-    visited = {start_node}
+    num_vertices = len(indptr) - 1
+    fwd_visited = bytearray(num_vertices)
+    fwd_visited[start_node] = 1
+    bwd_visited = bytearray(num_vertices)
+    bwd_visited[end_node] = 1
+    fwd_frontier = [start_node]
+    bwd_frontier = [end_node]
+
+    while fwd_frontier and bwd_frontier:
+        if len(fwd_frontier) <= len(bwd_frontier):
+            next_frontier = []
+            append = next_frontier.append
+            for u in fwd_frontier:
+                for v in indices[indptr[u]:indptr[u + 1]]:
+                    if bwd_visited[v]:
+                        return True
+                    if not fwd_visited[v]:
+                        fwd_visited[v] = 1
+                        append(v)
+            fwd_frontier = next_frontier
+        else:
+            next_frontier = []
+            append = next_frontier.append
+            for u in bwd_frontier:
+                for v in rev_indices[rev_indptr[u]:rev_indptr[u + 1]]:
+                    if fwd_visited[v]:
+                        return True
+                    if not bwd_visited[v]:
+                        bwd_visited[v] = 1
+                        append(v)
+            bwd_frontier = next_frontier
 
-    # Check if start_node is even in the graph
-    if start_node not in adj:
-        return False
+    return False
 
-    while queue:
-        current_vertex = queue.popleft()
+def _bfs_reachable_mask(start_node, indptr, indices, rev_indptr, rev_indices):
+    """
+    Marks every vertex reachable from start_node and returns the
+    byte-per-vertex mask.
+
+    Direction-optimizing (Beamer) BFS: levels run top-down (scan the
+    frontier's out-edges) while the frontier is small, and flip to
+    bottom-up (scan each unvisited vertex's in-edges for a frontier
+    predecessor) once the frontier's out-edges outweigh what is left to
+    explore -- the regime where top-down mostly re-touches visited
+    vertices. The reverse CSR needed for the bottom-up sweep is already
+    built for the to-t pass, so it comes for free.
+    """
+    # The compiled kernel (bfs.c via cbfs) runs the whole sweep in C
+    # when a compiler was available; the hybrid BFS below is the
+    # always-works fallback.
+    if cbfs.usable(indptr):
+        return cbfs.bfs_reachable_mask(start_node, indptr, indices)
+
+    num_vertices = len(indptr) - 1
+    visited = bytearray(num_vertices)
+    visited[start_node] = 1
+    frontier = [start_node]
+    unexplored_edges = len(indices)
+
+    while frontier:
+        frontier_edges = 0
+        for u in frontier:
+            frontier_edges += indptr[u + 1] - indptr[u]
+        unexplored_edges -= frontier_edges
+
+        if frontier_edges * 14 > unexplored_edges:
+            # Bottom-up sweep: a vertex joins the next level if any of
+            # its predecessors is in the current frontier; the scan can
+            # stop at the first hit instead of touching every out-edge.
+            in_frontier = bytearray(num_vertices)
+            for u in frontier:
+                in_frontier[u] = 1
+
+            next_frontier = []
+            append = next_frontier.append
+            for v in range(num_vertices):
+                if visited[v]:
+                    continue
+                for p in rev_indices[rev_indptr[v]:rev_indptr[v + 1]]:
+                    if in_frontier[p]:
+                        visited[v] = 1
+                        append(v)
+                        break
+        else:
+            next_frontier = []
+            append = next_frontier.append
+            for u in frontier:
+                for v in indices[indptr[u]:indptr[u + 1]]:
+                    if not visited[v]:
+                        visited[v] = 1
+                        append(v)
+
+        frontier = next_frontier
+
+    return visited
 
-        for neighbor in adj.get(current_vertex, []):
-            if neighbor == end_node:
-                return True
 
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append(neighbor)
+# --- "SOME" PROBLEM SOLVER ---
 
-    return False
 
-# --- "SOME" PROBLEM SOLVER ---
+def solve_some_on_graph(indptr, indices, rev_indptr, rev_indices,
+                        red_mask, s_id, t_id):
+    """
+    Solves Some over prebuilt forward/reverse CSR adjacencies. `red_mask`
+    is a byte-per-vertex mask and `s_id`/`t_id` are integer vertex IDs.
+    Returns a bool; callers stringify at the output boundary.
+    """
+    # --- 0. Cheap gate: can s reach t at all? ---
+    # Any red witness r composes into an s -> r -> t walk, so s must
+    # reach t for the answer to be true. The bidirectional probe settles
+    # the negative case (and most positives) far cheaper than the two
+    # full sweeps below.
+    if not _bidir_reach(s_id, t_id, indptr, indices,
+                        rev_indptr, rev_indices):
+        return False
+
+    # With the gate passed, s and t each sit in both reachability sets
+    # by definition, so a red endpoint decides the answer outright.
+    if red_mask[s_id] or red_mask[t_id]:
+        return True
+
+    # --- 1. Run two BFSs total, not two per red vertex ---
+    # One forward BFS marks everything s reaches; one BFS on the reverse
+    # graph marks everything that reaches t. A red vertex r lies on some
+    # s -> r -> t walk exactly when both masks have its bit set, so the
+    # per-red BFS pairs collapse into one mask overlap check each.
+    # Each pass hands the opposite direction's CSR along for the
+    # bottom-up sweeps: predecessors in the reverse graph are exactly
+    # the forward successors, and vice versa.
+    from_s = _bfs_reachable_mask(
+        s_id, indptr, indices, rev_indptr, rev_indices)
+    to_t = _bfs_reachable_mask(
+        t_id, rev_indptr, rev_indices, indptr, indices)
+
+    # --- 2. Check the red vertices against the two masks, in bulk ---
+    # int.from_bytes turns each mask into one big integer, so the triple
+    # AND runs at C speed over the whole vertex range instead of an
+    # interpreted loop per red vertex; any nonzero byte means some red
+    # vertex is both reachable from s and able to reach t.
+    overlap = (int.from_bytes(from_s, "little")
+               & int.from_bytes(to_t, "little")
+               & int.from_bytes(red_mask, "little"))
+    return overlap != 0
+
+
+def solve_some_on_instance(instance):
+    """Runs the solver on a parsed instance (see parse.parse_instance)."""
+    # An isolated endpoint leaves only the trivial one-vertex path.
+    if instance["s_id"] is None or instance["t_id"] is None:
+        return instance["s"] == instance["t"] and instance["s"] in instance["red"]
+
+    # A purely undirected CSR is its own reverse (symmetric arc pairs);
+    # only mixed/directed instances pay for the reverse build.
+    if instance["is_purely_undirected"]:
+        rev_indptr, rev_indices = instance["indptr"], instance["indices"]
+    else:
+        rev_indptr, rev_indices = _reverse_csr(
+            instance["indptr"], instance["indices"], instance["num_vertices"])
+    return solve_some_on_graph(
+        instance["indptr"],
+        instance["indices"],
+        rev_indptr,
+        rev_indices,
+        instance["red_mask"],
+        instance["s_id"],
+        instance["t_id"],
+    )
 
 
 def solve_some(n, edges, s, t, red_vertices):
+    """
+    Name-based entry point: builds the CSR graphs, then solves.
+    Returns a bool; callers stringify at the output boundary.
+    """
+    # --- 1. Build forward and reverse graphs ---
+    indptr, indices, rev_indptr, rev_indices, id_of = \
+        _build_adjacency_list(edges)
+    s_id = id_of.get(s)
+    t_id = id_of.get(t)
 
-    # --- 1. Build forward graph ---
-    adj = _build_adjacency_list(edges)
+    # An isolated endpoint leaves only the trivial one-vertex path.
+    if s_id is None or t_id is None:
+        return s == t and s in red_vertices
 
-    # --- 2. Loop through every red vertex ---
+    red_mask = bytearray(len(id_of))
     for r in red_vertices:
+        r_id = id_of.get(r)
+        if r_id is not None:
+            red_mask[r_id] = 1
 
-        # --- 3. Run two BFSs ---
-        # Check Part 1: Can s reach r?
-        can_s_reach_r = _bfs_can_reach(s, r, adj)
+    # --- 2. Solve on the prebuilt graphs ---
+    return solve_some_on_graph(
+        indptr, indices, rev_indptr, rev_indices, red_mask, s_id, t_id)
 
-        # Check Part 2: Can r reach t?
-        # We only run this if Part 1 was successful, to save time.
-        if can_s_reach_r:
-            can_r_reach_t = _bfs_can_reach(r, t, adj)
 
-            # If both parts are true, we found a valid path
-            if can_r_reach_t:
-                return "true"  # Found a valid path
-
-    # If we check all red vertices and find no such path
-    return "false"
+def _format_result(result):
+    """Stringifies a solver result at the output boundary: bools become
+    the 'true'/'false' the results table uses, error sentinels pass
+    through as-is."""
+    if result is True:
+        return "true"
+    if result is False:
+        return "false"
+    return str(result)
 
 
 def process_file(file_path):
-
-    try:
-        with open(file_path, 'r') as file:
-            data = [line.strip() for line in file.readlines() if line.strip()]
-    except Exception as e:
-        print(f"Unable to read file: {file_path}. Error: {e}", file=sys.stderr)
+    """Parses one instance via the shared parser and runs the solver."""
+    instance = load_instance(file_path)
+    if instance is None:
         return -1
 
     try:
-        n, m, r = map(int, data[0].split())
-        s, t = data[1].split()
-
-        vertex_lines_start = 2
-        vertex_lines_end = 2 + n
-        vertex_lines = data[vertex_lines_start: vertex_lines_end]
-
-        red_vertices = set()
-        for line in vertex_lines:
-            if line.endswith('*'):
-                red_vertices.add(line[:-1].strip())
-
-        edge_start_index = vertex_lines_end
-        edge_end_index = edge_start_index + m
-        edges = data[edge_start_index: edge_end_index]
-
-        # Call the "Some" solver
-        result = solve_some(n, edges, s, t, red_vertices)
-        return result
-
+        return solve_some_on_instance(instance)
     except Exception as e:
         print(
             f"Error processing file: {file_path}. Error: {e}", file=sys.stderr)
@@ -129,25 +299,34 @@ def main():
         print(f"Error reading input directory: {e}", file=sys.stderr)
         return
 
-    for file_name in sorted(files):
-        file_path = os.path.join(input_dir, file_name)
-
-        if os.path.isfile(file_path):
+    file_names = [name for name in sorted(files)
+                  if os.path.isfile(os.path.join(input_dir, name))]
+    file_paths = [os.path.join(input_dir, name) for name in file_names]
+
+    # Every instance is an independent solve, so fan the files out over a
+    # process pool and collect the results back in order. Writes happen in
+    # one pass at the end instead of interleaving with the solves.
+    results = []
+    with ProcessPoolExecutor() as executor:
+        chunksize = max(1, len(file_paths) // (4 * (os.cpu_count() or 1)))
+        for file_name, result in zip(
+                file_names,
+                executor.map(process_file, file_paths, chunksize=chunksize)):
             print(f"--- Processing {file_name} ---", file=sys.stderr)
 
-            # 1. Process the file
-            result = process_file(file_path)
+            # 1. Output to console
+            print(_format_result(result), file=sys.stdout)
 
-            # 2. Output to console
-            print(result, file=sys.stdout)
+            results.append((os.path.join(output_subdir, file_name), result))
 
-            # 3. Write to output file
-            output_file = os.path.join(output_subdir, file_name)
-            try:
-                with open(output_file, 'a') as f:
-                    f.write(str(result) + '\n')
-            except Exception as e:
-                print(f"Error writing to output file: {e}", file=sys.stderr)
+    # 2. Write to output files ('w' so re-runs overwrite instead of
+    # appending stale lines)
+    for output_file, result in results:
+        try:
+            with open(output_file, 'w') as f:
+                f.write(_format_result(result) + '\n')
+        except Exception as e:
+            print(f"Error writing to output file: {e}", file=sys.stderr)
 
     print("\nProcessing complete.", file=sys.stderr)
     print(f"Results for 'some' are in: {output_subdir}", file=sys.stderr)